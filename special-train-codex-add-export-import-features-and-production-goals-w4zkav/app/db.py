@@ -1,10 +1,13 @@
 # app/db.py
 from __future__ import annotations
 
+import hashlib
+import hmac
+import secrets
 import sqlite3
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .config import DB_PATH
 
@@ -381,7 +384,9 @@ def init_db() -> None:
         _ensure_columns(conn, "users", {
             "created_by": "TEXT NOT NULL DEFAULT ''",
             "updated_by": "TEXT NOT NULL DEFAULT ''",
+            "salt": "TEXT NOT NULL DEFAULT ''",
         })
+        _migrate_user_passwords(conn)
         _ensure_columns(conn, "lines", {
             "is_active": "INTEGER NOT NULL DEFAULT 1",
             "deleted_at": "TEXT NOT NULL DEFAULT ''",
@@ -400,6 +405,12 @@ def init_db() -> None:
             "deleted_by": "TEXT NOT NULL DEFAULT ''",
             "delete_reason": "TEXT NOT NULL DEFAULT ''",
         })
+        _ensure_columns(conn, "program_files", {
+            "hash_algo": "TEXT NOT NULL DEFAULT 'sha256'",
+        })
+        _ensure_columns(conn, "print_files", {
+            "hash_algo": "TEXT NOT NULL DEFAULT 'sha256'",
+        })
 
 
 
@@ -443,6 +454,17 @@ def _migrate_production_goals(conn: sqlite3.Connection) -> None:
 
 
 
+def _migrate_user_passwords(conn: sqlite3.Connection) -> None:
+    """Hash any plaintext passwords left from before salted hashes were stored."""
+    rows = conn.execute("SELECT username, password FROM users WHERE salt=''").fetchall()
+    for row in rows:
+        salt, hashed = _salted_password(row["password"] or "")
+        conn.execute(
+            "UPDATE users SET password=?, salt=? WHERE username=?",
+            (hashed, salt, row["username"]),
+        )
+
+
 def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
     existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
     for name, col_def in columns.items():
@@ -481,17 +503,42 @@ def list_audit_logs(limit: int = 500) -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+def hash_password(password: str, salt: str) -> str:
+    return hashlib.sha256((salt + (password or "")).encode("utf-8")).hexdigest()
+
+
+def _salted_password(password: str) -> Tuple[str, str]:
+    salt = secrets.token_hex(16)
+    return salt, hash_password(password, salt)
+
+
+def check_password(user: Dict[str, Any], password: str) -> bool:
+    """Constant-time check of `password` against a get_user() record."""
+    salt = user.get("salt") or ""
+    stored = user.get("password") or ""
+    if not salt:
+        # Row not migrated yet (init_db hashes these on startup).
+        return hmac.compare_digest(stored.encode("utf-8"), (password or "").encode("utf-8"))
+    try:
+        expected = bytes.fromhex(stored)
+    except ValueError:
+        return False
+    return hmac.compare_digest(bytes.fromhex(hash_password(password, salt)), expected)
+
+
 def seed_default_users(default_users: Dict[str, Dict[str, Any]]) -> None:
     with connect() as conn:
         for username, u in default_users.items():
+            salt, hashed = _salted_password(u.get("password", ""))
             conn.execute(
                 """
-                INSERT OR IGNORE INTO users(username, password, role, name, line)
-                VALUES(?,?,?,?,?)
+                INSERT OR IGNORE INTO users(username, password, salt, role, name, line)
+                VALUES(?,?,?,?,?,?)
                 """,
                 (
                     username,
-                    u.get("password", ""),
+                    hashed,
+                    salt,
                     u.get("role", "User"),
                     u.get("name", ""),
                     u.get("line", "Both"),
@@ -1329,13 +1376,15 @@ def upsert_user(
     created_by: str = "",
     updated_by: str = "",
 ) -> None:
+    salt, hashed = _salted_password(password)
     with connect() as conn:
         conn.execute(
             """
-            INSERT INTO users(username, password, role, name, line, is_active, created_by, updated_by)
-            VALUES(?,?,?,?,?,?,?,?)
+            INSERT INTO users(username, password, salt, role, name, line, is_active, created_by, updated_by)
+            VALUES(?,?,?,?,?,?,?,?,?)
             ON CONFLICT(username) DO UPDATE SET
               password=excluded.password,
+              salt=excluded.salt,
               role=excluded.role,
               name=excluded.name,
               line=excluded.line,
@@ -1343,7 +1392,7 @@ def upsert_user(
               updated_at=datetime('now'),
               updated_by=excluded.updated_by
             """,
-            (username, password, role, name, line, int(is_active), created_by or "", updated_by or ""),
+            (username, hashed, salt, role, name, line, int(is_active), created_by or "", updated_by or ""),
         )
 
 
@@ -1354,6 +1403,8 @@ def update_user_fields(username: str, fields: Dict[str, Any]) -> None:
     updates = {k: v for k, v in fields.items() if k in allowed}
     if not updates:
         return
+    if "password" in updates:
+        updates["salt"], updates["password"] = _salted_password(updates["password"])
     sets = ", ".join([f"{k}=?" for k in updates.keys()])
     params = list(updates.values()) + [username]
     with connect() as conn:
@@ -1366,7 +1417,7 @@ def update_user_fields(username: str, fields: Dict[str, Any]) -> None:
 def get_user(username: str) -> Optional[Dict[str, Any]]:
     with connect() as conn:
         row = conn.execute(
-            "SELECT username, password, role, name, line, is_active FROM users WHERE username=?",
+            "SELECT username, password, salt, role, name, line, is_active FROM users WHERE username=?",
             (username,),
         ).fetchone()
         return dict(row) if row else None
@@ -2032,76 +2083,100 @@ def get_active_print(
         return dict(row) if row else None
 
 
-def add_program_file(
-    *,
-    scope_type: str,
-    machine_id: Optional[int],
-    filename: str,
-    file_path: str,
-    file_hash: str,
-    revision: int,
-    parent_id: Optional[int],
-    created_by: str,
-    is_active: int = 1,
-) -> int:
+def add_program_files(rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert active revisions in one transaction; each row's parent is the revision it supersedes."""
+    ids: List[int] = []
     with connect() as conn:
-        row = conn.execute(
-            """
-            INSERT INTO program_files(
-                scope_type, machine_id, filename, file_path, file_hash,
-                revision, parent_id, created_by, is_active
+        for r in rows:
+            key = (r["scope_type"], r["filename"], r["machine_id"])
+            conn.execute(
+                """
+                UPDATE program_files
+                SET is_active=0
+                WHERE scope_type=?
+                  AND filename=?
+                  AND COALESCE(machine_id, 0)=COALESCE(?, 0)
+                """,
+                key,
             )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                scope_type,
-                machine_id,
-                filename,
-                file_path,
-                file_hash,
-                revision,
-                parent_id,
-                created_by or "",
-                int(is_active),
-            ),
-        )
-        return int(row.lastrowid)
+            cur = conn.execute(
+                """
+                INSERT INTO program_files(
+                    scope_type, machine_id, filename, file_path, file_hash, hash_algo,
+                    revision, parent_id, created_by, is_active
+                )
+                SELECT ?, ?, ?, ?, ?, ?, ?, (
+                    SELECT id
+                    FROM program_files
+                    WHERE scope_type=?
+                      AND filename=?
+                      AND COALESCE(machine_id, 0)=COALESCE(?, 0)
+                    ORDER BY revision DESC
+                    LIMIT 1
+                ), ?, 1
+                """,
+                (
+                    r["scope_type"],
+                    r["machine_id"],
+                    r["filename"],
+                    r["file_path"],
+                    r["file_hash"],
+                    r.get("hash_algo") or "sha256",
+                    r["revision"],
+                    *key,
+                    r.get("created_by") or "",
+                ),
+            )
+            ids.append(int(cur.lastrowid))
+    return ids
 
 
-def add_print_file(
-    *,
-    scope_type: str,
-    machine_id: Optional[int],
-    filename: str,
-    file_path: str,
-    file_hash: str,
-    revision: int,
-    parent_id: Optional[int],
-    created_by: str,
-    is_active: int = 1,
-) -> int:
+def add_print_files(rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert active revisions in one transaction; each row's parent is the revision it supersedes."""
+    ids: List[int] = []
     with connect() as conn:
-        row = conn.execute(
-            """
-            INSERT INTO print_files(
-                scope_type, machine_id, filename, file_path, file_hash,
-                revision, parent_id, created_by, is_active
+        for r in rows:
+            key = (r["scope_type"], r["filename"], r["machine_id"])
+            conn.execute(
+                """
+                UPDATE print_files
+                SET is_active=0
+                WHERE scope_type=?
+                  AND filename=?
+                  AND COALESCE(machine_id, 0)=COALESCE(?, 0)
+                """,
+                key,
             )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                scope_type,
-                machine_id,
-                filename,
-                file_path,
-                file_hash,
-                revision,
-                parent_id,
-                created_by or "",
-                int(is_active),
-            ),
-        )
-        return int(row.lastrowid)
+            cur = conn.execute(
+                """
+                INSERT INTO print_files(
+                    scope_type, machine_id, filename, file_path, file_hash, hash_algo,
+                    revision, parent_id, created_by, is_active
+                )
+                SELECT ?, ?, ?, ?, ?, ?, ?, (
+                    SELECT id
+                    FROM print_files
+                    WHERE scope_type=?
+                      AND filename=?
+                      AND COALESCE(machine_id, 0)=COALESCE(?, 0)
+                    ORDER BY revision DESC
+                    LIMIT 1
+                ), ?, 1
+                """,
+                (
+                    r["scope_type"],
+                    r["machine_id"],
+                    r["filename"],
+                    r["file_path"],
+                    r["file_hash"],
+                    r.get("hash_algo") or "sha256",
+                    r["revision"],
+                    *key,
+                    r.get("created_by") or "",
+                ),
+            )
+            ids.append(int(cur.lastrowid))
+    return ids
 
 
 def deactivate_program_revisions(
@@ -8,6 +8,8 @@ from ..permissions import can
 
 
 class Actor:
+    __slots__ = ("username", "role")
+
     def __init__(self, username: str, role: str):
         self.username = username or ""
         self.role = role or ""
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # optional; SHA-256 is used without it
+    _blake3 = None
+
+
+# Large reads keep the disk streaming. Buffers are borrowed from a small
+# pool so a bulk import doesn't allocate one per file, while idle import
+# workers don't each pin 8 MiB.
+HASH_BUFFER_SIZE = 8 * 1024 * 1024
+HASH_BUFFER_POOL = 2
+# Above this size the file is mapped and hashed in place, saving the copy
+# into user space; below it the mapping setup costs more than it saves.
+MMAP_THRESHOLD = 10 * 1024 * 1024
+
+# Algorithm used for new revisions. Each stored row records its own
+# hash_algo so rows hashed with SHA-256 stay comparable.
+DEFAULT_HASH_ALGO = "blake3" if _blake3 is not None else "sha256"
+SUPPORTED_HASH_ALGOS = ("sha256", "blake3") if _blake3 is not None else ("sha256",)
+
+# Same set str.isalnum() accepts, plus "-" and "_".
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w-]")
+
+_free_buffers: list[bytearray] = []
+_buffers_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def safe_folder_name(value: str) -> str:
+    return _UNSAFE_NAME_CHARS.sub("_", value.strip()) or "document"
+
+
+@contextmanager
+def _buffer():
+    with _buffers_lock:
+        buf = _free_buffers.pop() if _free_buffers else None
+    if buf is None:
+        buf = bytearray(HASH_BUFFER_SIZE)
+    try:
+        yield buf
+    finally:
+        with _buffers_lock:
+            if len(_free_buffers) < HASH_BUFFER_POOL:
+                _free_buffers.append(buf)
+
+
+def _new_hasher(algo: str):
+    if algo == "sha256":
+        return hashlib.sha256()
+    if algo == "blake3" and _blake3 is not None:
+        return _blake3(max_threads=_blake3.AUTO)
+    raise ValueError(f"Unsupported hash algorithm: {algo}")
+
+
+def hash_file(path: str, algo: str = DEFAULT_HASH_ALGO) -> str:
+    digest = _new_hasher(algo)
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):  # not available on Windows
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                digest.update(mm)
+            return digest.hexdigest()
+        with _buffer() as buf, memoryview(buf) as view:
+            while True:
+                n = handle.readinto(buf)
+                if not n:
+                    break
+                digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def hash_and_store(source_path: str, target_path: str, algo: str = DEFAULT_HASH_ALGO) -> str:
+    """Copy source_path to target_path and return its hash."""
+    if os.path.getsize(source_path) >= MMAP_THRESHOLD:
+        # Hash the mapping, then let the kernel copy (sendfile on Linux);
+        # the second pass hits the page cache instead of Python buffers.
+        digest = hash_file(source_path, algo)
+        store_file(source_path, target_path)
+        return digest
+    digest = _new_hasher(algo)
+    with _buffer() as buf, memoryview(buf) as view:
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            while True:
+                n = src.readinto(buf)
+                if not n:
+                    break
+                chunk = view[:n]
+                digest.update(chunk)
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+    return digest.hexdigest()
+
+
+def store_file(source_path: str, target_path: str) -> None:
+    """Copy source_path to target_path when its hash is already known.
+
+    copyfile uses the platform's in-kernel copy and skips copy2's metadata
+    pass; stored revisions don't need the source's timestamps.
+    """
+    shutil.copyfile(source_path, target_path)
+    with open(target_path, "rb+") as dst:
+        os.fsync(dst.fileno())
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-import hashlib
+import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
 from . import Actor, ensure_actor, require_permission
+from .file_storage import (
+    DEFAULT_HASH_ALGO,
+    SUPPORTED_HASH_ALGOS,
+    hash_and_store,
+    hash_file,
+    safe_folder_name,
+    store_file,
+)
 from .validation import validate_print_revision
 from ..audit import log_audit
 from ..config import DATA_DIR
 from ..db import (
-    add_print_file,
+    add_print_files,
     deactivate_print_revisions,
     get_active_print,
     list_print_revisions,
@@ -19,62 +27,93 @@ from ..db import (
 PERMISSION_KEY = "manage_documents"
 
 
-def _safe_folder_name(value: str) -> str:
-    return "".join([c if c.isalnum() or c in ("-", "_") else "_" for c in value.strip()]) or "document"
-
-
-def _hash_file(path: str) -> str:
-    digest = hashlib.sha256()
-    with open(path, "rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
-def _store_file(source_path: str, scope: str, filename: str, revision: int) -> str:
+def _target_path(source_path: str, scope: str, filename: str, revision: int) -> Path:
     ext = Path(source_path).suffix
-    target_dir = Path(DATA_DIR) / "storage" / "prints" / _safe_folder_name(scope) / _safe_folder_name(filename)
+    target_dir = Path(DATA_DIR) / "storage" / "prints" / safe_folder_name(scope) / safe_folder_name(filename)
     target_dir.mkdir(parents=True, exist_ok=True)
-    target_path = target_dir / f"rev_{revision}{ext}"
-    target_path.write_bytes(Path(source_path).read_bytes())
-    return str(target_path.relative_to(DATA_DIR))
+    return target_dir / f"rev_{revision}{ext}"
 
 
-def create_print_file(
+def _stored_size(stored_path: str) -> Optional[int]:
+    try:
+        return os.stat(Path(DATA_DIR) / stored_path).st_size
+    except OSError:
+        return None
+
+
+def stage_print_file(
     *,
     source_path: str,
     filename: str,
     scope_type: str,
     machine_id: Optional[int],
     actor_user: Actor | Dict[str, str] | None,
-) -> Tuple[str, Optional[int]]:
+    revisions: Optional[List[Dict]] = None,
+) -> Optional[Dict]:
+    """Store a new revision's file and return the row to record, or None for a duplicate.
+
+    Rows are written by record_print_files. Pass the same `revisions` list
+    when staging several files of one document; each staged row is added
+    to it.
+    """
     actor = ensure_actor(actor_user)
     require_permission(actor, PERMISSION_KEY, "add_print_file", "Machine History")
     validate_print_revision({"filename": filename, "scope_type": scope_type})
 
-    file_hash = _hash_file(source_path)
-    revisions = list_print_revisions(scope_type, filename, machine_id)
-    for rev in revisions:
-        if rev.get("file_hash") == file_hash:
-            return "DUPLICATE", None
-
+    if revisions is None:
+        revisions = list_print_revisions(scope_type, filename, machine_id)
     next_revision = (revisions[0]["revision"] + 1) if revisions else 1
-    deactivate_print_revisions(scope_type, filename, machine_id)
-    stored_path = _store_file(source_path, scope_type, filename, next_revision)
-    parent_id = revisions[0]["id"] if revisions else None
-    new_id = add_print_file(
-        scope_type=scope_type,
-        machine_id=machine_id,
-        filename=filename,
-        file_path=stored_path,
-        file_hash=file_hash,
-        revision=next_revision,
-        parent_id=parent_id,
-        created_by=actor.username,
-        is_active=1,
-    )
-    log_audit(actor.username, f"Added print file {filename} rev {next_revision}")
-    return "CREATED", new_id
+
+    # Only revisions of the same size can be duplicates, so the source is
+    # hashed up front just when one exists; otherwise it is hashed while
+    # being copied into the new revision's slot.
+    size = os.path.getsize(source_path)
+    hashes: Dict[str, str] = {}
+    for rev in revisions:
+        algo = rev.get("hash_algo") or "sha256"
+        if algo not in SUPPORTED_HASH_ALGOS or _stored_size(rev["file_path"]) != size:
+            continue
+        if algo not in hashes:
+            hashes[algo] = hash_file(source_path, algo)
+        if rev.get("file_hash") == hashes[algo]:
+            return None
+
+    target_path = _target_path(source_path, scope_type, filename, next_revision)
+    if DEFAULT_HASH_ALGO in hashes:
+        file_hash = hashes[DEFAULT_HASH_ALGO]
+        store_file(source_path, str(target_path))
+    else:
+        file_hash = hash_and_store(source_path, str(target_path))
+
+    row = {
+        "scope_type": scope_type,
+        "machine_id": machine_id,
+        "filename": filename,
+        "file_path": str(target_path.relative_to(DATA_DIR)),
+        "file_hash": file_hash,
+        "hash_algo": DEFAULT_HASH_ALGO,
+        "revision": next_revision,
+        "created_by": actor.username,
+    }
+    revisions.insert(0, row)
+    return row
+
+
+def record_print_files(
+    rows: List[Dict],
+    actor_user: Actor | Dict[str, str] | None,
+) -> List[int]:
+    actor = ensure_actor(actor_user)
+    require_permission(actor, PERMISSION_KEY, "add_print_file", "Machine History")
+    try:
+        ids = add_print_files(rows)
+    except Exception:
+        for row in rows:
+            (Path(DATA_DIR) / row["file_path"]).unlink(missing_ok=True)
+        raise
+    for row in rows:
+        log_audit(actor.username, f"Added print file {row['filename']} rev {row['revision']}")
+    return ids
 
 
 def list_print_revisions_service(
@@ -283,7 +283,8 @@ class AdminUI(tk.Frame):
         self.var_name.set(user.get("name", ""))
         self.var_role.set(user.get("role", self.ROLE_OPTIONS[0]))
         self.var_line.set(user.get("line", "Both"))
-        self.var_current_password.set(user.get("password", ""))
+        # Stored passwords are salted hashes; only show that one is set.
+        self.var_current_password.set("********" if user.get("password") else "")
         self.var_new_password.set("")
 
     def update_user(self):
@@ -316,7 +317,7 @@ class AdminUI(tk.Frame):
             {"password": new_password},
             actor_user={"username": self.controller.user, "role": self.controller.role},
         )
-        self.var_current_password.set(new_password)
+        self.var_current_password.set("********")
         self.var_new_password.set("")
         messagebox.showinfo("Password Reset", f"Password updated for {username}.")
 
@@ -1,4 +1,5 @@
 import tkinter as tk
+from functools import lru_cache
 from tkinter import ttk
 from .storage import list_month_files
 
@@ -67,8 +68,10 @@ class HeaderFrame(ttk.Frame):
         right = ttk.Frame(self)
         right.pack(side="right", padx=10)
 
+        self.controller = controller
         mode_text = "Light Mode" if controller.is_dark else "Dark Mode"
-        ttk.Button(right, text=mode_text, command=controller.toggle_theme, width=12).pack(side="left", padx=6)
+        self.mode_btn = ttk.Button(right, text=mode_text, command=controller.toggle_theme, width=12)
+        self.mode_btn.pack(side="left", padx=6)
         if getattr(controller, "can_edit_layout", lambda: False)():
             ttk.Button(right, text="Style", command=controller.open_style_editor, width=10).pack(
                 side="left", padx=6
@@ -77,46 +80,267 @@ class HeaderFrame(ttk.Frame):
             side="left", padx=6
         )
 
+    def refresh_theme(self):
+        self.mode_btn.configure(text="Light Mode" if self.controller.is_dark else "Dark Mode")
+
+
+_BG_OPTIONS = ("bg", "activebackground", "selectcolor")
+_FG_OPTIONS = ("fg", "activeforeground")
+
+
+def recolor(widget, colors):
+    """
+    Re-theme an existing widget tree in place.
+    Only classic tk widgets whose bg is the other palette's bg/header_bg were
+    built from controller.colors; their background options move to the same
+    key in `colors` and fg options only if they held the palette fg. Hard-coded
+    colors (white-on-blue buttons, canvases) are left alone.
+    ttk widgets follow the style and only HeaderFrame needs its button text updated.
+    """
+    old = DARK if colors is LIGHT else LIGHT
+    bg_map = {old["bg"]: colors["bg"], old["header_bg"]: colors["header_bg"]}
+    fg_map = {old["fg"]: colors["fg"]}
+    stack = [widget]
+    while stack:
+        w = stack.pop()
+        try:
+            themed = str(w.cget("bg")) in bg_map
+        except tk.TclError:
+            themed = False
+        if themed:
+            for options, mapping in ((_BG_OPTIONS, bg_map), (_FG_OPTIONS, fg_map)):
+                for opt in options:
+                    try:
+                        val = str(w.cget(opt))
+                    except tk.TclError:
+                        continue
+                    if val in mapping:
+                        w.configure({opt: mapping[val]})
+        if isinstance(w, HeaderFrame):
+            w.refresh_theme()
+        stack.extend(w.winfo_children())
+
+
+@lru_cache(maxsize=1)
+def _cached_month_files():
+    return tuple(list_month_files())
+
+
+def bump_month_files():
+    """Drop the cached month listing after new entries are written."""
+    _cached_month_files.cache_clear()
+
+
 class FilePicker(tk.Frame):
     def __init__(self, parent, on_change):
         super().__init__(parent)
+        self.on_change = on_change
+        self._vals = _cached_month_files()
         tk.Label(self, text="Month/File:").pack(side="left", padx=6)
-        self.cb = ttk.Combobox(self, values=list_month_files(), state="readonly", width=28)
+        self.cb = ttk.Combobox(self, values=list(self._vals), state="readonly", width=28)
         self.cb.pack(side="left", padx=6)
         self.cb.current(0)
         self.cb.bind("<<ComboboxSelected>>", lambda e: on_change(self.cb.get()))
-        ttk.Button(self, text="Reload", command=lambda: on_change(self.cb.get())).pack(side="left", padx=6)
+        ttk.Button(self, text="Reload", command=self.refresh).pack(side="left", padx=6)
+
+    def refresh(self):
+        bump_month_files()
+        vals = _cached_month_files()
+        # Only push the list through Tcl when the set of months changed.
+        if vals != self._vals:
+            current = self.cb.get()
+            self._vals = vals
+            self.cb.configure(values=list(vals))
+            if current not in vals:
+                self.cb.current(0)
+        self.on_change(self.cb.get())
 
     def get(self):
         return self.cb.get()
 
 class DataTable(ttk.Frame):
-    def __init__(self, parent, columns):
+    """Treeview that only keeps the rows currently in view inserted."""
+
+    WHEEL_STEP = 3
+
+    def __init__(self, parent, columns, page_size=40):
         super().__init__(parent)
         self.columns = columns
+        self._rows = []
+        self._window = (0, 0)
+        self._visible = page_size
+        # iid of the selected row, kept while it is scrolled out of the window
+        self._selected = None
         self.tree = ttk.Treeview(self, columns=columns, show="headings")
 
+        # Straight Tcl calls; Treeview.heading/column rebuild option dicts per call.
+        tcl = self.tree.tk.call
+        widget = str(self.tree)
         for c in columns:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, width=110)
+            tcl(widget, "heading", c, "-text", c)
+            tcl(widget, "column", c, "-width", 110)
 
-        sy = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        # The vertical scrollbar tracks the full row list, not the tree's own
+        # (windowed) contents.
+        self.sy = ttk.Scrollbar(self, orient="vertical", command=self._yview)
         sx = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=sy.set, xscroll=sx.set)
+        self.tree.configure(xscroll=sx.set)
 
-        sy.pack(side="right", fill="y")
+        self.sy.pack(side="right", fill="y")
         sx.pack(side="bottom", fill="x")
         self.tree.pack(fill="both", expand=True)
 
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        for key in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(key, self._on_key)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
+
     def load(self, df):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for _, row in df.iterrows():
-            self.tree.insert("", "end", values=[row.get(c, "") for c in self.columns])
+        # Unmap the tree while repopulating so Tk lays it out once, not per row.
+        self.tree.pack_forget()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        # Stringify every cell in one vectorized pass; Tk wants strings anyway.
+        self._rows = df.reindex(columns=self.columns, fill_value="").astype(str).to_numpy()
+        self._window = (0, 0)
+        self._selected = None
+        self._render(0)
+        self.tree.pack(fill="both", expand=True)
+        # Re-measure once real rows are laid out under the heading.
+        self.after_idle(self._on_configure)
+
+    def _render(self, first):
+        total = len(self._rows)
+        count = min(self._visible, total)
+        first = max(0, min(int(first), total - count))
+        last = first + count
+        old_first, old_last = self._window
+        tree = self.tree
+        rows = self._rows
+        # Record a fresh selection before its row can be deleted below; the
+        # <<TreeviewSelect>> event for it may still be queued.
+        selection = tree.selection()
+        if selection:
+            self._selected = selection[0]
+
+        if last <= old_first or first >= old_last:
+            children = tree.get_children()
+            if children:
+                tree.delete(*children)
+            for i in range(first, last):
+                tree.insert("", "end", iid=str(i), values=rows[i].tolist())
+        else:
+            # Overlapping windows: only touch the rows that scrolled in or out.
+            stale = [str(i) for i in range(old_first, first)] + [str(i) for i in range(last, old_last)]
+            if stale:
+                tree.delete(*stale)
+            for i in range(old_first - 1, first - 1, -1):
+                tree.insert("", 0, iid=str(i), values=rows[i].tolist())
+            for i in range(old_last, last):
+                tree.insert("", "end", iid=str(i), values=rows[i].tolist())
+
+        self._window = (first, last)
+        sel = self._selected
+        if sel is not None and self._in_window(sel) and sel not in tree.selection():
+            tree.selection_set(sel)
+        if total:
+            self.sy.set(first / total, last / total)
+        else:
+            self.sy.set(0.0, 1.0)
+
+    def _yview(self, *args):
+        first = self._window[0]
+        if args and args[0] == "moveto":
+            first = float(args[1]) * len(self._rows)
+        elif args and args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible
+            first += step
+        self._render(first)
+
+    def _on_wheel(self, event):
+        if event.state & 0x1:
+            # Shift+wheel scrolls sideways; leave it to the Treeview class binding.
+            return None
+        step = -self.WHEEL_STEP if event.num == 4 or event.delta > 0 else self.WHEEL_STEP
+        self._render(self._window[0] + step)
+        return "break"
+
+    def _on_key(self, event):
+        total = len(self._rows)
+        if not total:
+            return None
+        first, last = self._window
+        focus = self.tree.focus()
+        key = event.keysym
+        if not focus and key not in ("Home", "End"):
+            target = first
+        elif key == "Home":
+            target = 0
+        elif key == "End":
+            target = total - 1
+        elif key in ("Prior", "Next"):
+            target = int(focus) + (self._visible if key == "Next" else -self._visible)
+        else:
+            target = int(focus) + (1 if key == "Down" else -1)
+        target = max(0, min(total - 1, target))
+        # Rows outside the window aren't in the tree; move the window first.
+        if target < first:
+            self._render(target)
+        elif target >= last:
+            self._render(target - self._visible + 1)
+        iid = str(target)
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        self.tree.see(iid)
+        return "break"
+
+    def _in_window(self, iid):
+        first, last = self._window
+        return first <= int(iid) < last
+
+    def _on_select(self, _event=None):
+        sel = self.tree.selection()
+        if sel:
+            self._selected = sel[0]
+        elif self._selected is not None and self._in_window(self._selected):
+            # Deselected while in view. A row deleted by _render on its way
+            # out of the window keeps its selection.
+            self._selected = None
+
+    def _on_configure(self, _event=None):
+        tree = self.tree
+        children = tree.get_children()
+        box = tree.bbox(children[0]) if children else ""
+        if box:
+            # The first row starts below the border and heading; assume the
+            # bottom border matches the left one.
+            left, top, _width, rowheight = box
+            avail = tree.winfo_height() - top - left
+        else:
+            try:
+                rowheight = int(ttk.Style(self).lookup("Treeview", "rowheight"))
+            except (TypeError, ValueError):
+                rowheight = 20
+            # No row to measure yet; reserve one row's height for the heading.
+            avail = tree.winfo_height() - rowheight
+        visible = max(1, avail // max(1, rowheight))
+        if visible != self._visible:
+            self._visible = visible
+            self._render(self._window[0])
 
     def selected_id(self):
         sel = self.tree.selection()
         if not sel:
-            return None
+            # Only a row scrolled out of the window is still selected.
+            if self._selected is None or self._in_window(self._selected):
+                return None
+            vals = self._rows[int(self._selected)]
+            return vals[0] if len(vals) else None
         vals = self.tree.item(sel[0], "values")
         return vals[0] if vals else None
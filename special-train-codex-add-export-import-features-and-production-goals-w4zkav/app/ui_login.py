@@ -1,25 +1,18 @@
 # app/ui_login.py
+import importlib
+import inspect
 import tkinter as tk
+from functools import lru_cache
 from tkinter import messagebox, ttk
 import tkinter.font as tkfont
 
 from .bootstrap import ensure_app_initialized
-from .db import get_user, update_user_fields, get_meta, set_meta
+from .db import get_user, check_password, update_user_fields, get_meta, set_meta
 from .audit import log_audit
-from .ui_common import LIGHT, DARK
-from .permissions import screen_access as permission_screen_access, can_edit_screen as permission_can_edit_screen, ROLE_SCREEN_DEFAULTS
+from .ui_common import LIGHT, DARK, recolor
+from .permissions import screen_access as permission_screen_access, ROLE_SCREEN_DEFAULTS
 from .screen_registry import SCREEN_REGISTRY
 
-# Role UIs
-from .ui_toolchanger import ToolChangerUI
-from .ui_operator import OperatorUI
-from .ui_leader import LeaderUI
-from .ui_quality import QualityUI
-from .ui_top import TopUI
-from .ui_admin import AdminUI
-from .ui_super import SuperUI
-from .ui_uide import UIDEUI
-
 
 # -----------------------------
 # Role normalization (aliases)
@@ -45,29 +38,88 @@ ROLE_ALIASES = {
     "uide": "UIDE",
 }
 
+# Lowercased alias -> canonical role, including each canonical name itself.
+NORMALIZED_ROLES = dict(ROLE_ALIASES)
+NORMALIZED_ROLES.update({v.lower(): v for v in set(ROLE_ALIASES.values())})
+
+
+@lru_cache(maxsize=64)
+def _normalize_role_str(r: str) -> str:
+    r = r.strip()
+    return NORMALIZED_ROLES.get(r.lower(), r)
+
+
 def normalize_role(role_value):
     if role_value is None:
         return ""
-    r = str(role_value).strip()
-    if not r:
-        return ""
-    key = r.lower().strip()
-    return ROLE_ALIASES.get(key, r)
+    return _normalize_role_str(str(role_value))
 
 
 # -----------------------------
 # Role to UI mapping
 # -----------------------------
+# (module, class) pairs; only the logged-in role's UI module gets imported.
 ROLE_TO_UI = {
-    "Tool Changer": ToolChangerUI,
-    "Operator": OperatorUI,
-    "Leader": LeaderUI,
-    "Quality": QualityUI,
-    "Top (Super User)": SuperUI,  # Super = "all screens console"
-    "Admin": AdminUI,
-    "UIDE": UIDEUI,
+    "Tool Changer": ("app.ui_toolchanger", "ToolChangerUI"),
+    "Operator": ("app.ui_operator", "OperatorUI"),
+    "Leader": ("app.ui_leader", "LeaderUI"),
+    "Quality": ("app.ui_quality", "QualityUI"),
+    "Top (Super User)": ("app.ui_super", "SuperUI"),  # Super = "all screens console"
+    "Admin": ("app.ui_admin", "AdminUI"),
+    "UIDE": ("app.ui_uide", "UIDEUI"),
 }
 
+_ROLE_UI_CLASSES = {}
+
+
+def get_role_ui_class(role):
+    ui_cls = _ROLE_UI_CLASSES.get(role)
+    if ui_cls is None:
+        entry = ROLE_TO_UI.get(role)
+        if not entry:
+            return None
+        module_name, class_name = entry
+        ui_cls = getattr(importlib.import_module(module_name), class_name)
+        _ROLE_UI_CLASSES[role] = ui_cls
+    return ui_cls
+
+
+_ACCEPTS_SHOW_HEADER = {}
+
+
+def _accepts_show_header(ui_cls):
+    accepts = _ACCEPTS_SHOW_HEADER.get(ui_cls)
+    if accepts is None:
+        params = inspect.signature(ui_cls.__init__).parameters
+        accepts = "show_header" in params or any(
+            p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()
+        )
+        _ACCEPTS_SHOW_HEADER[ui_cls] = accepts
+    return accepts
+
+
+_ROUTERS = {}
+
+
+def get_role_router(role):
+    """
+    Return a `route(app)` callable that shows this role's UI, or None for an
+    unknown role. Class lookup and the show_header decision happen once here.
+    """
+    route = _ROUTERS.get(role)
+    if route is None:
+        ui_cls = get_role_ui_class(role)
+        if ui_cls is None:
+            return None
+        if _accepts_show_header(ui_cls):
+            def route(app):
+                return app._swap_to(role, lambda: ui_cls(app.container, app, show_header=True))
+        else:
+            def route(app):
+                return app._swap_to(role, lambda: ui_cls(app.container, app))
+        _ROUTERS[role] = route
+    return route
+
 
 # -----------------------------
 # Main App (Tk root)
@@ -85,6 +137,13 @@ class App(tk.Tk):
         self.is_dark = False
         self.colors = LIGHT
         self.style = ttk.Style(self)
+        self._fonts = (
+            tkfont.nametofont("TkDefaultFont"),
+            tkfont.nametofont("TkTextFont"),
+            tkfont.nametofont("TkHeadingFont"),
+        )
+        # (style_name, option) -> last value sent to Tk for the active theme
+        self._last_style = {}
         self.theme_settings = {
             "theme": "clam",
             "dark": False,
@@ -96,9 +155,15 @@ class App(tk.Tk):
         self.user = None
         self.role = None
         self.user_line = None
+        self._route = None
+        # Screen access levels for the logged-in user; cleared on login/logout.
+        self._perm_cache = {}
+        self._extra_screens_cached = None
 
         self.container = tk.Frame(self)
         self.container.pack(fill="both", expand=True)
+        # Pages are kept alive and swapped with pack/pack_forget; see _swap_to.
+        self._pages = {}
 
         if get_meta("shown_default_login") != "1":
             messagebox.showinfo(
@@ -113,36 +178,47 @@ class App(tk.Tk):
         self.is_dark = not self.is_dark
         self.theme_settings["dark"] = self.is_dark
         self.apply_theme_settings()
-
-        if self.user:
-            self.route_role()
-        else:
-            self.show_login()
-
-    def clear(self):
-        for w in self.container.winfo_children():
-            w.destroy()
+        self.refresh_pages()
+
+    def refresh_pages(self):
+        """Re-color the live pages after the light/dark palette changed."""
+        recolor(self.container, self.colors)
+
+    def _swap_to(self, key, factory):
+        for k, page in self._pages.items():
+            if k != key:
+                page.pack_forget()
+        page = self._pages.get(key)
+        if page is None or not page.winfo_exists():
+            page = factory()
+            self._pages[key] = page
+        page.pack(fill="both", expand=True)
+        return page
+
+    def _drop_pages(self, keep=()):
+        for key in [k for k in self._pages if k not in keep]:
+            self._pages.pop(key).destroy()
 
     def show_login(self):
-        self.clear()
         self.container.configure(bg=self.colors["bg"])
-        LoginPage(self.container, self).pack(fill="both", expand=True)
+        page = self._swap_to("login", lambda: LoginPage(self.container, self))
+        page.reset()
 
     def login(self, username, role, line=None):
+        # self.role is always canonical; route_role/can_edit_layout rely on it.
+        assert normalize_role(role) == role, f"login() expects a normalized role, got {role!r}"
         self.user = username
-        self.role = normalize_role(role)
+        self.role = role
         self.user_line = line or "Both"
+        self._route = get_role_router(role)
+        self._clear_permission_cache()
         log_audit(username, f"Login as {self.role}")
         self.route_role()
 
     def route_role(self):
-        self.clear()
         self.container.configure(bg=self.colors["bg"])
 
-        role = normalize_role(self.role)
-        ui_cls = ROLE_TO_UI.get(role)
-
-        if not ui_cls:
+        if self._route is None:
             messagebox.showerror(
                 "Role Error",
                 f"Unknown role '{self.role}'.\n\n"
@@ -151,24 +227,25 @@ class App(tk.Tk):
             self.logout()
             return
 
-        # SuperUI doesn't accept show_header
-        if ui_cls is SuperUI:
-            ui_cls(self.container, self).pack(fill="both", expand=True)
-            return
+        self._route(self)
 
-        # Other screens: try show_header pattern, fall back if not supported
-        try:
-            ui_cls(self.container, self, show_header=True).pack(fill="both", expand=True)
-        except TypeError:
-            ui_cls(self.container, self).pack(fill="both", expand=True)
+    def _clear_permission_cache(self):
+        self._perm_cache = {}
+        self._extra_screens_cached = None
 
     def screen_access(self, screen: str) -> str:
-        return permission_screen_access(self.role, self.user, screen)
+        level = self._perm_cache.get(screen)
+        if level is None:
+            level = permission_screen_access(self.role, self.user, screen)
+            self._perm_cache[screen] = level
+        return level
 
     def can_edit_screen(self, screen: str) -> bool:
-        return permission_can_edit_screen(self.role, self.user, screen)
+        return self.screen_access(screen) in ("edit", "override")
 
     def extra_screens(self):
+        if self._extra_screens_cached is not None:
+            return self._extra_screens_cached
         defaults = ROLE_SCREEN_DEFAULTS.get(self.role, {})
         extras = []
         for screen in SCREEN_REGISTRY.keys():
@@ -176,10 +253,11 @@ class App(tk.Tk):
                 continue
             if self.screen_access(screen) != "none":
                 extras.append(screen)
+        self._extra_screens_cached = extras
         return extras
 
     def can_edit_layout(self) -> bool:
-        return normalize_role(self.role) == "UIDE"
+        return self.role == "UIDE"
 
     def open_style_editor(self):
         StyleEditor(self, self.theme_settings, on_apply=self.apply_theme_settings)
@@ -191,47 +269,72 @@ class App(tk.Tk):
         font_size = int(settings.get("font_size", 11))
         spacing_scale = float(settings.get("spacing_scale", 1.0))
 
-        try:
-            self.style.theme_use(theme)
-        except tk.TclError:
-            self.style.theme_use("clam")
+        current_theme = self.style.theme_use()
+        if theme != current_theme:
+            try:
+                self.style.theme_use(theme)
+            except tk.TclError:
+                self.style.theme_use("clam")
+            if self.style.theme_use() != current_theme:
+                # Style options are per theme, so nothing cached applies anymore.
+                self._last_style = {}
 
         self.is_dark = bool(dark)
         self.colors = DARK if self.is_dark else LIGHT
 
-        default_font = tkfont.nametofont("TkDefaultFont")
+        default_font, text_font, heading_font = self._fonts
         default_font.configure(size=font_size)
-        tkfont.nametofont("TkTextFont").configure(size=font_size)
-        tkfont.nametofont("TkHeadingFont").configure(size=font_size + 1, weight="bold")
+        text_font.configure(size=font_size)
+        heading_font.configure(size=font_size + 1, weight="bold")
 
         padding = int(max(4, font_size * 0.6 * spacing_scale))
-        self.style.configure("TFrame", background=self.colors["bg"])
-        self.style.configure("TLabel", background=self.colors["bg"], foreground=self.colors["fg"])
-        self.style.configure("Header.TLabel", background=self.colors["header_bg"], foreground=self.colors["fg"])
-        self.style.configure("TButton", padding=(padding, padding // 2))
-        self.style.configure("Danger.TButton", foreground="white", background="#d9534f")
-        self.style.map(
+        self._cfg("TFrame", background=self.colors["bg"])
+        self._cfg("TLabel", background=self.colors["bg"], foreground=self.colors["fg"])
+        self._cfg("Header.TLabel", background=self.colors["header_bg"], foreground=self.colors["fg"])
+        self._cfg("TButton", padding=(padding, padding // 2))
+        self._cfg("Danger.TButton", foreground="white", background="#d9534f")
+        self._map(
             "Danger.TButton",
             background=[("active", "#c9302c")],
         )
-        self.style.configure(
+        self._cfg(
             "Treeview",
             background=self.colors["bg"],
             foreground=self.colors["fg"],
             fieldbackground=self.colors["bg"],
         )
-        self.style.configure(
+        self._cfg(
             "Treeview.Heading",
             background=self.colors["header_bg"],
             foreground=self.colors["fg"],
         )
 
+    def _cfg(self, name, **kw):
+        """style.configure, skipping options already set to the same value."""
+        changed = {k: v for k, v in kw.items() if self._last_style.get((name, k)) != v}
+        if changed:
+            self.style.configure(name, **changed)
+            for k, v in changed.items():
+                self._last_style[(name, k)] = v
+
+    def _map(self, name, **kw):
+        """style.map counterpart of _cfg."""
+        changed = {k: v for k, v in kw.items() if self._last_style.get((name, "map", k)) != v}
+        if changed:
+            self.style.map(name, **changed)
+            for k, v in changed.items():
+                self._last_style[(name, "map", k)] = v
+
     def logout(self):
         if self.user:
             log_audit(self.user, "Logout")
         self.user = None
         self.role = None
         self.user_line = None
+        self._route = None
+        self._clear_permission_cache()
+        # Role screens hold per-user state; only the login page is reused.
+        self._drop_pages(keep=("login",))
         self.show_login()
 
 
@@ -270,10 +373,10 @@ class LoginPage(tk.Frame):
 
         ttk.Button(
             btns,
-            text="Show/Reset Password",
+            text="Reset Password",
             font=("Arial", 10, "bold"),
             width=18,
-            command=self.show_or_reset_password
+            command=self.reset_password
         ).pack(side="left", padx=6)
 
 
@@ -282,6 +385,11 @@ class LoginPage(tk.Frame):
         self.u.bind("<Return>", lambda e: self.check())
         self.p.bind("<Return>", lambda e: self.check())
 
+    def reset(self):
+        self.u.delete(0, "end")
+        self.p.delete(0, "end")
+        self.u.focus_set()
+
     def check(self):
         u = self.u.get().strip()
         p = self.p.get()
@@ -295,7 +403,7 @@ class LoginPage(tk.Frame):
             messagebox.showerror("Error", "Invalid credentials.")
             return
 
-        if rec.get("password", "") != p:
+        if not check_password(rec, p):
             messagebox.showerror("Error", "Invalid credentials.")
             return
 
@@ -314,7 +422,7 @@ class LoginPage(tk.Frame):
         self.controller.login(u, role, line)
         messagebox.showinfo("Welcome", f"welcome '{rec.get('name', u)}'")
 
-    def show_or_reset_password(self):
+    def reset_password(self):
         u = self.u.get().strip()
         if not u:
             messagebox.showerror("Error", "Enter username first.")
@@ -323,8 +431,8 @@ class LoginPage(tk.Frame):
         if not rec:
             messagebox.showerror("Error", "User not found.")
             return
-        current = rec.get("password", "")
-        if messagebox.askyesno("Current Password", f"Current password for {u} is: {current}\n\nReset it?"):
+        # Passwords are stored hashed, so the current one can no longer be shown.
+        if messagebox.askyesno("Reset Password", f"Reset the password for {u}?"):
             new_pw = self.p.get().strip()
             if not new_pw:
                 messagebox.showerror("Error", "Enter new password in the Password field.")
@@ -374,8 +482,13 @@ class StyleEditor(tk.Toplevel):
         ttk.Button(btns, text="Close", command=self.destroy).pack(side="right")
 
     def _apply(self):
+        old_dark = bool(self.settings.get("dark", False))
         self.settings["theme"] = self.theme_var.get()
         self.settings["dark"] = self.dark_var.get()
         self.settings["font_size"] = self.font_var.get()
         self.settings["spacing_scale"] = self.spacing_var.get()
         self.on_apply()
+        # ttk picks up the new styles by itself; tk widgets only need a pass
+        # when the palette actually flipped.
+        if old_dark != bool(self.settings["dark"]):
+            self.controller.refresh_pages()
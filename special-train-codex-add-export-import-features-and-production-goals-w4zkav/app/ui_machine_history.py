@@ -1,9 +1,11 @@
 # app/ui_machine_history.py
 from __future__ import annotations
 
+import codecs
 import os
 import shutil
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
@@ -11,20 +13,44 @@ from tkinter import filedialog, messagebox, ttk
 from .config import DATA_DIR
 from .db import get_machine_id_for_line, list_print_files, list_program_files
 from .services.program_revision_service import (
-    create_program_file,
     list_program_revisions_service,
+    record_program_files,
     rollback_program_revision,
+    stage_program_file,
 )
 from .services.print_revision_service import (
-    create_print_file,
     list_print_revisions_service,
+    record_print_files,
     rollback_print_revision,
+    stage_print_file,
 )
 from .services.tool_life_service import list_lines_service, list_machines
 
 
 PROGRAM_EXTENSIONS = (".txt", ".nc", ".tap", ".cnc")
 PRINT_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg")
+_PROGRAM_FILETYPES = (("Programs", " ".join(f"*{ext}" for ext in PROGRAM_EXTENSIONS)), ("All files", "*.*"))
+_PRINT_FILETYPES = (("Prints", " ".join(f"*{ext}" for ext in PRINT_EXTENSIONS)), ("All files", "*.*"))
+
+# Imports hash and copy files off the Tk thread; hashlib releases the GIL on
+# large updates, so several files progress in parallel.
+IMPORT_WORKERS = 8
+IMPORT_POLL_MS = 100
+# Typing in Search re-queries once the user pauses this long.
+SEARCH_DEBOUNCE_MS = 200
+# The program viewer streams files in blocks and stops after each batch;
+# "Load more" pulls in the next batch.
+VIEWER_BLOCK_SIZE = 64 * 1024
+VIEWER_BATCH_SIZE = 2 * 1024 * 1024
+
+_import_executor: ThreadPoolExecutor | None = None
+
+
+def _get_import_executor() -> ThreadPoolExecutor:
+    global _import_executor
+    if _import_executor is None:
+        _import_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="doc-import")
+    return _import_executor
 
 
 def _normalize_doc_name(filename: str) -> str:
@@ -50,12 +76,31 @@ class MachineHistoryUI(tk.Frame):
         self.readonly = not controller.can_edit_screen("Master Data")
         self._selected_doc_name: str | None = None
         self._selected_doc_type: str | None = None
+        self._search_after_id: str | None = None
+        self._poll_after_id: str | None = None
+        # iid -> values currently shown, so refreshes only touch changed rows
+        self._doc_rows: dict[str, tuple] = {}
+        self._rev_rows: dict[str, tuple] = {}
+        # iid -> latest revision row from the last document query
+        self._latest_rows: dict[str, dict] = {}
+        # Revisions of the selected document; None means "fetch on next use".
+        self._current_revisions: list[dict] | None = None
 
         self._build_filters()
         self._build_layout()
         self._apply_readonly()
         self.refresh_documents()
 
+    def destroy(self) -> None:
+        # Pending after() callbacks are Tcl commands owned by this widget and
+        # would fail with "invalid command name" once it is gone. An import
+        # in flight still records its batch on the worker pool.
+        for after_id in (self._search_after_id, self._poll_after_id):
+            if after_id:
+                self.after_cancel(after_id)
+        self._search_after_id = self._poll_after_id = None
+        super().destroy()
+
     def _build_filters(self) -> None:
         filters = tk.Frame(self, bg=self.controller.colors["bg"], padx=10, pady=8)
         filters.pack(fill="x")
@@ -70,13 +115,13 @@ class MachineHistoryUI(tk.Frame):
             width=14,
         )
         self.line_combo.pack(side="left", padx=6)
-        self.line_combo.bind("<<ComboboxSelected>>", lambda _e: self._refresh_machine_options())
+        self.line_combo.bind("<<ComboboxSelected>>", self._on_line_selected)
 
         tk.Label(filters, text="Machine", bg=self.controller.colors["bg"], fg=self.controller.colors["fg"]).pack(side="left")
         self.machine_var = tk.StringVar()
         self.machine_combo = ttk.Combobox(filters, textvariable=self.machine_var, values=[], state="readonly", width=16)
         self.machine_combo.pack(side="left", padx=6)
-        self.machine_combo.bind("<<ComboboxSelected>>", lambda _e: self.refresh_documents())
+        self.machine_combo.bind("<<ComboboxSelected>>", self._on_machine_selected)
 
         tk.Label(filters, text="Type", bg=self.controller.colors["bg"], fg=self.controller.colors["fg"]).pack(side="left")
         self.type_var = tk.StringVar(value="All")
@@ -88,13 +133,13 @@ class MachineHistoryUI(tk.Frame):
             width=10,
         )
         self.type_combo.pack(side="left", padx=6)
-        self.type_combo.bind("<<ComboboxSelected>>", lambda _e: self.refresh_documents())
+        self.type_combo.bind("<<ComboboxSelected>>", self._on_type_selected)
 
         tk.Label(filters, text="Search", bg=self.controller.colors["bg"], fg=self.controller.colors["fg"]).pack(side="left")
         self.search_var = tk.StringVar()
         self.search_entry = tk.Entry(filters, textvariable=self.search_var, width=24)
         self.search_entry.pack(side="left", padx=6)
-        self.search_var.trace_add("write", lambda *_: self.refresh_documents())
+        self.search_var.trace_add("write", self._on_search_changed)
 
         actions = tk.Frame(self, bg=self.controller.colors["bg"], padx=10, pady=6)
         actions.pack(fill="x")
@@ -129,7 +174,7 @@ class MachineHistoryUI(tk.Frame):
             self.doc_tree.heading(col, text=heading)
             self.doc_tree.column(col, width=width, anchor="w")
         self.doc_tree.pack(fill="both", expand=True)
-        self.doc_tree.bind("<<TreeviewSelect>>", lambda _e: self._load_document_details())
+        self.doc_tree.bind("<<TreeviewSelect>>", self._on_doc_selected)
 
         detail_header = tk.Label(
             right,
@@ -178,6 +223,27 @@ class MachineHistoryUI(tk.Frame):
             self.machine_var.set(machines[0])
         else:
             self.machine_var.set("")
+        self._reload_documents()
+
+    def _on_line_selected(self, _event=None) -> None:
+        self._refresh_machine_options()
+
+    def _on_machine_selected(self, _event=None) -> None:
+        self._reload_documents()
+
+    def _on_type_selected(self, _event=None) -> None:
+        self.refresh_documents()
+
+    def _on_doc_selected(self, _event=None) -> None:
+        self._load_document_details()
+
+    def _on_search_changed(self, *_args) -> None:
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self) -> None:
+        self._search_after_id = None
         self.refresh_documents()
 
     def _doc_type_filter(self) -> str | None:
@@ -188,49 +254,71 @@ class MachineHistoryUI(tk.Frame):
             return "print"
         return None
 
-    def refresh_documents(self) -> None:
-        for item in self.doc_tree.get_children():
-            self.doc_tree.delete(item)
+    @staticmethod
+    def _sync_tree(tree: ttk.Treeview, shown: dict[str, tuple], rows: dict[str, tuple]) -> None:
+        """Make `tree` show `rows` (in order), touching only rows that changed."""
+        stale = [iid for iid in shown if iid not in rows]
+        if stale:
+            tree.delete(*stale)
+        for index, (iid, values) in enumerate(rows.items()):
+            current = shown.get(iid)
+            if current is None:
+                tree.insert("", index, iid=iid, values=values)
+            elif current != values:
+                tree.item(iid, values=values)
+        shown.clear()
+        shown.update(rows)
+
+    def _clear_document_details(self) -> None:
         self._selected_doc_name = None
         self._selected_doc_type = None
-        for item in self.rev_tree.get_children():
-            self.rev_tree.delete(item)
+        self._current_revisions = None
+        self._sync_tree(self.rev_tree, self._rev_rows, {})
 
+    def _reload_documents(self) -> None:
+        self._current_revisions = None
+        self.refresh_documents()
+
+    def refresh_documents(self) -> None:
+        self._latest_rows = self._query_documents()
+        doc_rows = {
+            iid: (
+                row.get("filename", ""),
+                "Program" if row["_doc_type"] == "program" else "Print",
+                row.get("revision") or "",
+                row.get("created_at") or "",
+                row.get("created_by") or "",
+            )
+            for iid, row in self._latest_rows.items()
+        }
+        self._sync_tree(self.doc_tree, self._doc_rows, doc_rows)
+        if not self.doc_tree.selection():
+            self._clear_document_details()
+        elif self._current_revisions is None:
+            self._load_document_details()
+
+    def _query_documents(self) -> dict[str, dict]:
         line = self.line_var.get().strip()
         machine = self.machine_var.get().strip()
         if not line or not machine:
-            return
+            return {}
 
         machine_id = get_machine_id_for_line(line, machine)
         if machine_id is None:
-            return
+            return {}
 
         doc_type = self._doc_type_filter()
         search = self.search_var.get().strip()
-        rows: list[dict] = []
+        rows: dict[str, dict] = {}
         if doc_type in (None, "program"):
             for row in list_program_files("MACHINE", machine_id, search=search):
                 row["_doc_type"] = "program"
-                rows.append(row)
+                rows[f"program:{row.get('filename', '')}"] = row
         if doc_type in (None, "print"):
             for row in list_print_files("MACHINE", machine_id, search=search):
                 row["_doc_type"] = "print"
-                rows.append(row)
-
-        for row in rows:
-            doc_type_key = row.get("_doc_type", "program")
-            doc_type_label = "Program" if doc_type_key == "program" else "Print"
-            doc_name = row.get("filename", "")
-            rev = row.get("revision") or ""
-            updated = row.get("created_at") or ""
-            updated_by = row.get("created_by") or ""
-            iid = f"{doc_type_key}:{doc_name}"
-            self.doc_tree.insert(
-                "",
-                "end",
-                iid=iid,
-                values=(doc_name, doc_type_label, rev, updated, updated_by),
-            )
+                rows[f"print:{row.get('filename', '')}"] = row
+        return rows
 
     def _load_document_details(self) -> None:
         selection = self.doc_tree.selection()
@@ -244,29 +332,28 @@ class MachineHistoryUI(tk.Frame):
         self._selected_doc_name = doc_name
         self._selected_doc_type = doc_type_key
 
-        for item in self.rev_tree.get_children():
-            self.rev_tree.delete(item)
         line = self.line_var.get().strip()
         machine = self.machine_var.get().strip()
         machine_id = get_machine_id_for_line(line, machine)
         if machine_id is None:
+            self._current_revisions = []
+            self._sync_tree(self.rev_tree, self._rev_rows, {})
             return
         if self._selected_doc_type == "program":
             revisions = list_program_revisions_service("MACHINE", doc_name, machine_id)
         else:
             revisions = list_print_revisions_service("MACHINE", doc_name, machine_id)
-        for rev in revisions:
-            self.rev_tree.insert(
-                "",
-                "end",
-                iid=str(rev["id"]),
-                values=(
-                    rev.get("revision", ""),
-                    rev.get("created_at", ""),
-                    rev.get("created_by", ""),
-                    Path(rev.get("file_path", "")).name,
-                ),
+        self._current_revisions = revisions
+        rev_rows = {
+            str(rev["id"]): (
+                rev.get("revision", ""),
+                rev.get("created_at", ""),
+                rev.get("created_by", ""),
+                Path(rev.get("file_path", "")).name,
             )
+            for rev in revisions
+        }
+        self._sync_tree(self.rev_tree, self._rev_rows, rev_rows)
 
     def _require_line_machine(self) -> tuple[str, str] | None:
         line = self.line_var.get().strip()
@@ -294,43 +381,103 @@ class MachineHistoryUI(tk.Frame):
             messagebox.showerror("Missing Machine", "Unable to resolve machine ID.")
             return
 
-        if doc_type == "program":
-            filetypes = [("Programs", "*.txt *.nc *.tap *.cnc"), ("All files", "*.*")]
-        else:
-            filetypes = [("Prints", "*.pdf *.png *.jpg *.jpeg"), ("All files", "*.*")]
-
+        filetypes = _PROGRAM_FILETYPES if doc_type == "program" else _PRINT_FILETYPES
         paths = filedialog.askopenfilenames(title="Import Documents", filetypes=filetypes)
         if not paths:
             return
-        user = _get_username(self.controller)
+        actor = {"username": _get_username(self.controller), "role": getattr(self.controller, "role", "") or ""}
+        # Files that map to the same document name share revision numbers,
+        # so each such group is saved in order on a single worker.
+        groups: dict[str, list[str]] = {}
+        for path in paths:
+            groups.setdefault(_normalize_doc_name(os.path.basename(path)), []).append(path)
+        executor = _get_import_executor()
+        futures = {
+            executor.submit(self._stage_documents, name, group, machine_id, doc_type, actor): group
+            for name, group in groups.items()
+        }
+        # Queued behind the staging tasks, so it never waits on one that
+        # has not been given a worker.
+        batch = executor.submit(self._record_documents, futures, doc_type, actor)
+        self._set_import_busy(True)
+        self._poll_after_id = self.after(IMPORT_POLL_MS, self._poll_imports, batch)
+
+    @staticmethod
+    def _stage_documents(
+        doc_name: str, paths: list[str], machine_id: int, doc_type: str, actor: dict
+    ) -> tuple[list[dict], list[tuple[str, Exception]]]:
+        """Worker-thread body: store each file of one document, collecting rows to record and failures."""
+        if doc_type == "program":
+            stage, list_revisions = stage_program_file, list_program_revisions_service
+        else:
+            stage, list_revisions = stage_print_file, list_print_revisions_service
+        # Shared across the group so each file is numbered after the last.
+        revisions = list_revisions("MACHINE", doc_name, machine_id)
+        rows, failures = [], []
         for path in paths:
             try:
-                self._save_document(path, machine_id, doc_type, user)
+                row = stage(
+                    source_path=path,
+                    filename=doc_name,
+                    scope_type="MACHINE",
+                    machine_id=machine_id,
+                    actor_user=actor,
+                    revisions=revisions,
+                )
+                if row is None:
+                    raise ValueError(f"{doc_name} is already stored with identical content.")
+                rows.append(row)
             except Exception as exc:
-                messagebox.showerror("Import Failed", f"Failed to import {path}\n{exc}")
-        self.refresh_documents()
+                failures.append((path, exc))
+        return rows, failures
+
+    @staticmethod
+    def _record_documents(
+        futures: dict, doc_type: str, actor: dict
+    ) -> tuple[list[tuple[str, Exception]], Exception | None]:
+        """Worker-thread body: record every staged revision in one transaction.
+
+        Returns the per-file staging failures and the error that rolled back
+        the whole batch, if any.
+        """
+        wait(futures)
+        rows, failures = [], []
+        for future, paths in futures.items():
+            exc = future.exception()
+            if exc is not None:
+                failures.extend((path, exc) for path in paths)
+                continue
+            staged, failed = future.result()
+            rows.extend(staged)
+            failures.extend(failed)
+        if rows:
+            record = record_program_files if doc_type == "program" else record_print_files
+            try:
+                record(rows, actor)
+            except Exception as exc:
+                return failures, exc
+        return failures, None
 
-    def _save_document(self, source_path: str, machine_id: int, doc_type: str, user: str) -> None:
-        doc_name = _normalize_doc_name(os.path.basename(source_path))
-        actor = {"username": user, "role": getattr(self.controller, "role", "") or ""}
-        if doc_type == "program":
-            status, _ = create_program_file(
-                source_path=source_path,
-                filename=doc_name,
-                scope_type="MACHINE",
-                machine_id=machine_id,
-                actor_user=actor,
-            )
-        else:
-            status, _ = create_print_file(
-                source_path=source_path,
-                filename=doc_name,
-                scope_type="MACHINE",
-                machine_id=machine_id,
-                actor_user=actor,
-            )
-        if status == "DUPLICATE":
-            raise ValueError(f"{doc_name} is already stored with identical content.")
+    def _poll_imports(self, batch) -> None:
+        if not batch.done():
+            self._poll_after_id = self.after(IMPORT_POLL_MS, self._poll_imports, batch)
+            return
+        self._poll_after_id = None
+        self._set_import_busy(False)
+        exc = batch.exception()
+        failures, batch_error = ([], exc) if exc is not None else batch.result()
+        for path, err in failures:
+            messagebox.showerror("Import Failed", f"Failed to import {path}\n{err}")
+        if batch_error is not None:
+            messagebox.showerror("Import Failed", f"No files from this import were saved.\n{batch_error}")
+        self._reload_documents()
+
+    def _set_import_busy(self, busy: bool) -> None:
+        if self.readonly:
+            return
+        state = "disabled" if busy else "normal"
+        self.import_program_btn.configure(state=state)
+        self.import_print_btn.configure(state=state)
 
     def _selected_revision(self) -> dict | None:
         if not self._selected_doc_name or not self._selected_doc_type:
@@ -339,30 +486,18 @@ class MachineHistoryUI(tk.Frame):
         if not selection:
             return None
         revision_id = int(selection[0])
-        line = self.line_var.get().strip()
-        machine = self.machine_var.get().strip()
-        machine_id = get_machine_id_for_line(line, machine)
-        if machine_id is None:
-            return None
-        if self._selected_doc_type == "program":
-            revisions = list_program_revisions_service("MACHINE", self._selected_doc_name, machine_id)
-        else:
-            revisions = list_print_revisions_service("MACHINE", self._selected_doc_name, machine_id)
-        return next((rev for rev in revisions if rev["id"] == revision_id), None)
+        return next((rev for rev in self._revisions() if rev["id"] == revision_id), None)
 
     def _get_current_revision(self) -> dict | None:
         if not self._selected_doc_name or not self._selected_doc_type:
             return None
-        line = self.line_var.get().strip()
-        machine = self.machine_var.get().strip()
-        machine_id = get_machine_id_for_line(line, machine)
-        if machine_id is None:
-            return None
-        if self._selected_doc_type == "program":
-            revisions = list_program_revisions_service("MACHINE", self._selected_doc_name, machine_id)
-        else:
-            revisions = list_print_revisions_service("MACHINE", self._selected_doc_name, machine_id)
-        return revisions[0] if revisions else None
+        # The document query already returns each document's latest revision.
+        return self._latest_rows.get(f"{self._selected_doc_type}:{self._selected_doc_name}")
+
+    def _revisions(self) -> list[dict]:
+        if self._current_revisions is None:
+            self._load_document_details()
+        return self._current_revisions or []
 
     def _resolve_path(self, stored_path: str) -> Path:
         return Path(DATA_DIR) / stored_path
@@ -393,7 +528,7 @@ class MachineHistoryUI(tk.Frame):
         doc_name = self._selected_doc_name or "document"
         filename = f"{doc_name}_rev{revision['revision']}{ext}"
         target_path = Path(target_dir) / filename
-        shutil.copy2(stored_path, target_path)
+        shutil.copyfile(stored_path, target_path)
         messagebox.showinfo("Exported", f"Exported to {target_path}")
 
     def _open_selected(self) -> None:
@@ -414,11 +549,42 @@ class MachineHistoryUI(tk.Frame):
         top = tk.Toplevel(self)
         top.title(f"Program Viewer - {path.name}")
         top.geometry("700x500")
+        footer = tk.Frame(top)
+        footer.pack(side="bottom", fill="x")
         text = tk.Text(top, wrap="none")
         text.pack(fill="both", expand=True)
-        with open(path, "r", encoding="utf-8", errors="replace") as handle:
-            text.insert("1.0", handle.read())
-        text.configure(state="disabled")
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        total = path.stat().st_size
+        offset = 0
+
+        def load_batch() -> None:
+            nonlocal offset
+            more_btn.configure(state="disabled")
+            text.configure(state="normal")
+            with open(path, "rb") as handle:
+                handle.seek(offset)
+                loaded = 0
+                while loaded < VIEWER_BATCH_SIZE:
+                    block = handle.read(VIEWER_BLOCK_SIZE)
+                    if not block:
+                        break
+                    loaded += len(block)
+                    text.insert("end", decoder.decode(block))
+                    top.update_idletasks()
+                offset += loaded
+            if offset >= total:
+                text.insert("end", decoder.decode(b"", final=True))
+                footer.pack_forget()
+            else:
+                status.configure(text=f"Showing {offset // 1024:,} of {total // 1024:,} KiB")
+                more_btn.configure(state="normal")
+            text.configure(state="disabled")
+
+        status = tk.Label(footer, text="")
+        status.pack(side="left", padx=6)
+        more_btn = ttk.Button(footer, text="Load more", command=load_batch)
+        more_btn.pack(side="right", padx=6, pady=4)
+        load_batch()
 
     def _recall_selected(self) -> None:
         if self.readonly:
@@ -453,21 +619,15 @@ class MachineHistoryUI(tk.Frame):
                 target_revision_id=revision["id"],
                 actor_user=actor,
             )
-        self._load_document_details()
-        self.refresh_documents()
+        self._reload_documents()
 
     def _delete_document(self) -> None:
         if self.readonly:
             return
-        selection = self.doc_tree.selection()
-        if not selection:
+        doc_name, doc_type = self._selected_doc_name, self._selected_doc_type
+        if not doc_name or not doc_type:
             messagebox.showinfo("Delete", "Select a document first.")
             return
-        iid = selection[0]
-        if ":" in iid:
-            doc_type, doc_name = iid.split(":", 1)
-        else:
-            doc_type, doc_name = "program", iid
         if not messagebox.askyesno("Deactivate Document", "Mark this document as inactive?"):
             return
         line = self.line_var.get().strip()
@@ -483,4 +643,4 @@ class MachineHistoryUI(tk.Frame):
             from ..db import deactivate_print_revisions
 
             deactivate_print_revisions("MACHINE", doc_name, machine_id)
-        self.refresh_documents()
+        self._reload_documents()
@@ -5,7 +5,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
-from .ui_common import HeaderFrame
+from .ui_common import HeaderFrame, bump_month_files
 from .storage import safe_int, safe_float
 from .services.tool_life_service import (
     create_shift_report,
@@ -330,6 +330,8 @@ class OperatorUI(tk.Frame):
             actor_user={"username": self.controller.user, "role": self.controller.role},
         )
 
+        bump_month_files()
+
         messagebox.showinfo("Saved", "Shift production report submitted for leader signoff.")
         self.shift_qty_entry.delete(0, "end")
         self.has_downtime_var.set(False)
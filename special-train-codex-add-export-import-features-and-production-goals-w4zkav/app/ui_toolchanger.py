@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
-from .ui_common import HeaderFrame
+from .ui_common import HeaderFrame, bump_month_files
 from .ui_action_center import ActionCenterUI
 from .ui_audit import AuditTrailUI
 from .screen_registry import get_screen_class
@@ -268,6 +268,8 @@ class ToolChangerUI(tk.Frame):
             actor_user={"username": self.controller.user, "role": self.controller.role},
         )
 
+        bump_month_files()
+
         messagebox.showinfo("Saved", f"Entry saved.\nTool cost: ${cost:,.2f}")
 
         # reset defect UI